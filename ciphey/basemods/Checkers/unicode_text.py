@@ -1,7 +1,45 @@
+from functools import lru_cache
 from typing import Dict, Optional
+import re
 import unicodedata
 from ciphey.iface import Checker, Config, ParamSpec, T, registry
 
+# Character classes used by the lookup table below
+_OTHER, _LETTER, _UPPER, _NUMBER, _PUNCT, _SYMBOL = range(6)
+# The only classes the check looks at
+_COUNTED_CLASSES = (_LETTER, _UPPER, _PUNCT)
+
+# Maps a Unicode general category to one of the classes above
+_CATEGORY_CLASSES = {
+    "Lu": _UPPER,
+    "Ll": _LETTER, "Lt": _LETTER, "Lm": _LETTER, "Lo": _LETTER,
+    "Nd": _NUMBER, "Nl": _NUMBER, "No": _NUMBER,
+    "Pc": _PUNCT, "Pd": _PUNCT, "Ps": _PUNCT, "Pe": _PUNCT,
+    "Pi": _PUNCT, "Pf": _PUNCT, "Po": _PUNCT,
+    "Sm": _SYMBOL, "Sc": _SYMBOL, "Sk": _SYMBOL, "So": _SYMBOL,
+}
+
+# bytes.translate table for the common all-ASCII case, which never needs the full table below
+_ASCII_TABLE = bytes(
+    _CATEGORY_CLASSES.get(unicodedata.category(chr(i)), _OTHER) for i in range(256)
+)
+
+# Code points outside the BMP are left untouched by the table, so we look them up separately
+_ASTRAL_RE = re.compile("[\U00010000-\U0010FFFF]")
+
+
+@lru_cache()
+def _category_table() -> str:
+    """
+    Returns a str.translate table mapping every BMP code point to its class (as a character).
+    Building it takes a few milliseconds, so it is only done on first use.
+    """
+    table = bytearray(0x10000)
+    for cp in range(0x10000):
+        table[cp] = _CATEGORY_CLASSES.get(unicodedata.category(chr(cp)), _OTHER)
+    return table.decode("latin-1")
+
+
 @registry.register
 class UnicodeChecker(Checker[str]):
     """
@@ -9,41 +47,39 @@ class UnicodeChecker(Checker[str]):
     """
     
     def check(self, text: T) -> Optional[str]:
-        if not text or len(text.strip()) == 0:
+        if not text:
             return None
         
         # For this checker, we want to identify text that looks like natural language
         # This includes Chinese characters, Latin letters, numbers, and reasonable punctuation
         
-        text = text.strip()
-        if len(text) < 3:  # Too short to be meaningful
-            return None
-        
-        # Count different character types
-        letter_count = 0  # All letters (including Chinese)
-        upper_count = 0   # Uppercase Latin letters (often in random text)
-        punct_count = 0   # Punctuation
-        symbol_count = 0  # Symbols
-        number_count = 0  # Numbers
-        
-        for char in text:
-            category = unicodedata.category(char)
-            if category.startswith('L'):  # Letters (any script)
-                letter_count += 1
-                if category == 'Lu':  # Uppercase letter
-                    upper_count += 1
-            elif category.startswith('N'):  # Numbers
-                number_count += 1
-            elif category.startswith('P'):  # Punctuation
-                punct_count += 1
-            elif category.startswith('S'):  # Symbols
-                symbol_count += 1
-        
+        # Only copy the text if there is actually whitespace to strip
+        if text[0].isspace() or text[-1].isspace():
+            text = text.strip()
         total_chars = len(text)
+        if total_chars < 3:  # Too short to be meaningful
+            return None
         
+        # Classify every character with a single table lookup, then count the classes we need
+        counts = [0] * 6
+        if text.isascii():
+            classes = text.encode("ascii").translate(_ASCII_TABLE)
+            for cls in _COUNTED_CLASSES:
+                counts[cls] = classes.count(cls)
+        else:
+            classes = text.translate(_category_table())
+            for cls in _COUNTED_CLASSES:
+                counts[cls] = classes.count(chr(cls))
+            for char in _ASTRAL_RE.findall(text):
+                counts[_CATEGORY_CLASSES.get(unicodedata.category(char), _OTHER)] += 1
+
+        upper_count = counts[_UPPER]  # Uppercase Latin letters (often in random text)
+        letter_count = counts[_LETTER] + upper_count  # All letters (including Chinese)
+        punct_count = counts[_PUNCT]  # Punctuation
+
         # Calculate ratios
         letter_ratio = letter_count / total_chars
-        upper_ratio = upper_count / total_chars if total_chars > 0 else 0
+        upper_ratio = upper_count / total_chars
         punct_ratio = punct_count / total_chars
         
         # Criteria for meaningful text:
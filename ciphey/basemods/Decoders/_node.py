@@ -0,0 +1,190 @@
+"""
+A long-lived Node.js process shared by the decoders that need to run JavaScript
+
+Spawning node for every candidate costs far more than evaluating the candidate itself,
+so one worker is started on first use and fed one JSON request per line.
+"""
+import atexit
+import json
+import queue
+import subprocess
+import threading
+from typing import NamedTuple, Optional
+
+import logging
+
+# Evaluates each request in a fresh context that has Node's process and require, capturing
+# what the code writes to the console or to process.stdout/stderr
+_WORKER_JS = r"""
+const readline = require("readline");
+const util = require("util");
+const vm = require("vm");
+
+readline.createInterface({ input: process.stdin }).on("line", (line) => {
+  const request = JSON.parse(line);
+  let stdout = "";
+  let stderr = "";
+  // Only console.log/info are rendered with util.inspect, like a script overriding console.log
+  const formatOut = (args) =>
+    request.inspect ? args.map((arg) => util.inspect(arg)).join(" ") : util.format(...args);
+  const console = {
+    log: (...args) => { stdout += formatOut(args) + "\n"; },
+    info: (...args) => { stdout += formatOut(args) + "\n"; },
+    error: (...args) => { stderr += util.format(...args) + "\n"; },
+    warn: (...args) => { stderr += util.format(...args) + "\n"; },
+  };
+  const stream = (write) => ({ write: (chunk) => { write(String(chunk)); return true; } });
+  // The real process, except that output is captured and exiting only ends this request
+  const sandboxProcess = Object.create(process, {
+    stdout: { value: stream((chunk) => { stdout += chunk; }) },
+    stderr: { value: stream((chunk) => { stderr += chunk; }) },
+    exit: { value: (code) => { throw { exitCode: code === undefined ? 0 : code }; } },
+  });
+  const sandboxRequire = (id) =>
+    id === "process" || id === "node:process" ? sandboxProcess : require(id);
+  // Timers can be set, but any still pending once the code returns are cancelled,
+  // as their output could no longer be reported and they must not run into the next request
+  const pending = [];
+  const timer = (set, clear) => (...args) => {
+    const handle = set(...args);
+    pending.push(() => clear(handle));
+    return handle;
+  };
+  const context = {
+    console,
+    process: sandboxProcess,
+    require: sandboxRequire,
+    Buffer,
+    setTimeout: timer(setTimeout, clearTimeout),
+    setInterval: timer(setInterval, clearInterval),
+    setImmediate: timer(setImmediate, clearImmediate),
+    clearTimeout,
+    clearInterval,
+    clearImmediate,
+  };
+  let ok = true;
+  try {
+    // Promise callbacks run inside the timeout rather than after the reply has been sent
+    vm.runInNewContext(request.code, context, {
+      timeout: request.timeout,
+      microtaskMode: "afterEvaluate",
+    });
+  } catch (e) {
+    if (e !== null && typeof e === "object" && "exitCode" in e && Object.keys(e).length === 1) {
+      ok = e.exitCode === 0;
+    } else {
+      ok = false;
+      stderr += String(e) + "\n";
+    }
+  }
+  pending.forEach((cancel) => cancel());
+  process.stdout.write(JSON.stringify({ id: request.id, ok, stdout, stderr }) + "\n");
+});
+"""
+
+
+class NodeResult(NamedTuple):
+    """
+    Attributes:
+        ok          Whether the code ran without throwing
+        stdout      Everything passed to console.log/info (one call per line) or process.stdout.write
+        stderr      Everything passed to console.error/warn or process.stderr.write,
+                    plus the error if one was thrown
+    """
+
+    ok: bool
+    stdout: str
+    stderr: str
+
+
+class _NodeWorker:
+    def __init__(self):
+        self._proc = None
+        self._replies = None
+        self._available = True
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _start(self):
+        self._proc = subprocess.Popen(
+            ["node", "-e", _WORKER_JS],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+        )
+        self._replies = queue.Queue()
+        # Replies are read on a separate thread so that we can time out portably
+        threading.Thread(
+            target=self._read, args=(self._proc, self._replies), daemon=True
+        ).start()
+
+    @staticmethod
+    def _read(proc: subprocess.Popen, replies: queue.Queue):
+        for line in proc.stdout:
+            replies.put(line)
+        replies.put(None)
+
+    def stop(self):
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc = None
+
+    def run(self, code: str, inspect: bool, timeout: float) -> Optional[NodeResult]:
+        with self._lock:
+            if not self._available:
+                return None
+            try:
+                if self._proc is None or self._proc.poll() is not None:
+                    self._start()
+                self._next_id += 1
+                request = {
+                    "id": self._next_id,
+                    "code": code,
+                    "inspect": inspect,
+                    "timeout": int(timeout * 1000),
+                }
+                self._proc.stdin.write(json.dumps(request) + "\n")
+                self._proc.stdin.flush()
+                # Give node a little longer than the script timeout before giving up on it
+                reply = self._replies.get(timeout=timeout + 5)
+            except FileNotFoundError:
+                logging.debug("Node.js is not available")
+                self._available = False
+                return None
+            except (OSError, queue.Empty):
+                self.stop()
+                return None
+
+            if reply is None:
+                # The worker died, a new one will be started on the next call
+                self.stop()
+                return None
+
+            try:
+                reply = json.loads(reply)
+            except json.JSONDecodeError:
+                reply = None
+            if not isinstance(reply, dict) or reply.get("id") != request["id"]:
+                # Something else wrote to the worker's stdout, so its replies can no longer be
+                # matched to requests. Start afresh rather than hand out another request's result
+                self.stop()
+                return None
+
+            return NodeResult(ok=reply["ok"], stdout=reply["stdout"], stderr=reply["stderr"])
+
+
+_worker = _NodeWorker()
+atexit.register(_worker.stop)
+
+
+def run_javascript(code: str, inspect: bool = False, timeout: float = 15) -> Optional[NodeResult]:
+    """
+    Runs `code` in the shared Node.js worker and returns what it logged, or None if
+    Node.js is unavailable or the code did not finish within `timeout` seconds
+
+    The code can use Node's process, require and timers. If `inspect` is set, console.log/info arguments
+    are rendered with util.inspect (so strings are quoted)
+    """
+    return _worker.run(code, inspect, timeout)
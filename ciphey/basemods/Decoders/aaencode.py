@@ -1,14 +1,39 @@
-import re
-import subprocess
-import tempfile
-import os
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 import logging
 from rich.logging import RichHandler
 
 from ciphey.iface import Config, Decoder, ParamSpec, T, U, registry
 
+from ._node import run_javascript
+
+# Full-width Latin, half-width Katakana and CJK punctuation ranges typical of aaEncode
+_SPECIAL_RANGES = [(0xFF65, 0xFFDC), (0xFFE8, 0xFFEE), (0x3000, 0x303F), (0xFF00, 0xFFEF)]
+# Characters that show up in almost every aaEncoded string
+_SPECIFIC_CHARS = "ﾟωﾉΘДεｏｃ"
+
+
+def _build_byte_tables() -> Tuple[bytes, bytes]:
+    """
+    Builds bytes.translate tables for the high and low bytes of UTF-16 code units
+
+    Each special range lies within a single high byte and gets its own bit, so a code unit
+    is special exactly when its high and low byte masks share a bit
+    """
+    high = bytearray(256)
+    low = bytearray(256)
+    bits = {}
+    for start, end in _SPECIAL_RANGES:
+        assert start >> 8 == end >> 8, "ranges must not span high bytes"
+        bit = bits.setdefault(start >> 8, 1 << len(bits))
+        high[start >> 8] |= bit
+        for byte in range(start & 0xFF, (end & 0xFF) + 1):
+            low[byte] |= bit
+    return bytes(high), bytes(low)
+
+
+_HIGH_TABLE, _LOW_TABLE = _build_byte_tables()
+
 
 @registry.register
 class AaEncode(Decoder[str]):
@@ -40,13 +65,21 @@ class AaEncode(Decoder[str]):
         
         if len(text) < 100:  # aaEncode is typically quite long
             return False
+
+        # aaEncode output starts with its face characters, so look for them before scanning everything
+        head = text[:64]
+        if "ﾟ" not in head and "ω" not in head:
+            return False
             
         # Count aaEncode typical characters (full-width Latin, half-width Katakana, etc.)
-        # These include characters like: ﾟ ω ゝ Θ Д etc.
-        special_unicode_chars = len(re.findall(r'[\uFF65-\uFFDC\uFFE8-\uFFEE\u3000-\u303F\uFF00-\uFFEF]', text))
-        
-        # Also look for specific aaEncode characters
-        specific_chars = len(re.findall(r'[ﾟωﾉΘДεｏｃ]', text))
+        # by masking the high and low bytes of every UTF-16 code unit at once; astral
+        # characters become surrogates, which are never special
+        units = text.encode("utf-16-be", "surrogatepass")
+        high = int.from_bytes(units[0::2].translate(_HIGH_TABLE), "big")
+        low = int.from_bytes(units[1::2].translate(_LOW_TABLE), "big")
+        special_unicode_chars = bin(high & low).count("1")
+        # Count the specific aaEncode characters like: ﾟ ω ゝ Θ Д etc.
+        specific_chars = sum(map(text.count, _SPECIFIC_CHARS))
         
         # Calculate ratios
         special_ratio = special_unicode_chars / len(text)
@@ -60,55 +93,21 @@ class AaEncode(Decoder[str]):
         """
         Executes aaEncode string by using JavaScript engine
         """
-        try:
-            # Simple direct execution without complex output capture
-            # This matches the successful test we ran earlier
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False, encoding='utf-8') as f:
-                f.write(aaencode_code)
-                temp_file = f.name
-                
-            try:
-                # Execute the JavaScript code using Node.js
-                result = subprocess.run(['node', temp_file], 
-                                      capture_output=True, 
-                                      text=True, 
-                                      timeout=15)
-                
-                if result.returncode == 0:
-                    output = result.stdout.strip()
-                    if output and len(output) > 0:
-                        # Remove quotes if they surround the output
-                        output = output.strip()
-                        if output.startswith("'") and output.endswith("'"):
-                            output = output[1:-1]  # Remove surrounding quotes
-                        return output
-                    else:
-                        # If stdout is empty, maybe the result is in stderr
-                        if result.stderr and len(result.stderr.strip()) > 0:
-                            return result.stderr.strip()
-                else:
-                    # If the first method fails, try inline execution
-                    result2 = subprocess.run(['node', '-e', aaencode_code], 
-                                           capture_output=True, 
-                                           text=True, 
-                                           timeout=15)
-                    if result2.returncode == 0:
-                        output = result2.stdout.strip()
-                        if output and len(output) > 0:
-                            # Remove quotes if they surround the output
-                            output = output.strip()
-                            if output.startswith("'") and output.endswith("'"):
-                                output = output[1:-1]  # Remove surrounding quotes
-                            return output
-                return None
-            finally:
-                # Clean up the temporary file
-                os.unlink(temp_file)
-                
-        except (subprocess.TimeoutExpired, subprocess.CalledProcessError, FileNotFoundError):
+        result = run_javascript(aaencode_code)
+        if result is None or not result.ok:
             # If Node.js is not available or execution fails, return None
             return None
 
+        output = result.stdout.strip()
+        if output:
+            # Remove quotes if they surround the output
+            if output.startswith("'") and output.endswith("'"):
+                output = output[1:-1]  # Remove surrounding quotes
+            return output
+
+        # If stdout is empty, maybe the result is in stderr
+        return result.stderr.strip() or None
+
     @staticmethod
     def priority() -> float:
         # Lower priority since it requires external execution
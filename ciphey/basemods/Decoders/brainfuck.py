@@ -1,4 +1,3 @@
-import re
 import time
 from typing import Dict, Optional, Tuple
 
@@ -118,7 +117,7 @@ class Brainfuck(Decoder[str]):
 
         for idx, instruction in enumerate(program):
             # If instruction is brainfuck (without input) or whitespace, it counts
-            if instruction in legal_instructions or re.match(r"\s", instruction):
+            if instruction in legal_instructions or instruction.isspace():
                 legal_count += 1
 
             if not prints and instruction == ".":
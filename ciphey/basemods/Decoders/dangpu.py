@@ -4,7 +4,6 @@
 """
 
 from typing import Optional, Dict
-import re
 from ciphey.iface import Config, Decoder, ParamSpec, T, U, registry
 
 @registry.register
@@ -29,49 +28,43 @@ class Dangpu(Decoder[str]):
             '井': '8',  # 8个出头
             '羊': '9',  # 9个出头
         }
+        # str.translate 用的转换表：汉字 -> 数字；原文中的数字映射为非数字字符，保证解码失败
+        self._trans = {ord(k): ord(v) for k, v in self.dangpu_map.items()}
+        self._trans.update({ord(d): ord('x') for d in '0123456789'})
 
     def decode(self, ctext: T) -> Optional[U]:
         """
         解码当铺密码
         """
-        # 按照空格分割文本，每个部分代表一个数字组
-        parts = re.split(r'\s+', ctext.strip())
+        # 按照空白分割文本，每个部分代表一个数字组
+        parts = ctext.split()
         
-        if not parts or all(len(part.strip()) == 0 for part in parts):
+        if not parts:
             return None
 
         # 将每个部分的汉字转换为数字，然后组合成ASCII码
-        ascii_text = ""
+        chars = []
         
         for part in parts:
-            if not part:
-                continue
-                
-            # 将当前部分的汉字转换为数字序列
-            digit_part = ""
-            for char in part:
-                if char in self.dangpu_map:
-                    digit_part += self.dangpu_map[char]
-                else:
-                    # 如果遇到不在映射表中的汉字，返回空
-                    return None
-            
-            if digit_part:
-                try:
-                    # 将整个部分的数字作为一个ASCII码
-                    num = int(digit_part)
-                    if 32 <= num <= 126:  # 可打印ASCII范围
-                        ascii_text += chr(num)
-                    else:
-                        # 如果数字超出可打印范围，直接返回None
-                        return None
-                except ValueError:
-                    return None
+            # 一次性将当前部分的汉字转换为数字序列
+            digit_part = part.translate(self._trans)
+            # 如果遇到不在映射表中的字符，返回空
+            if not (digit_part.isascii() and digit_part.isdigit()):
+                return None
 
-        if ascii_text:
-            return ascii_text
+            try:
+                # 将整个部分的数字作为一个ASCII码
+                num = int(digit_part)
+            except ValueError:
+                # 数字过长（超过int的位数限制）时无法转换
+                return None
+            if 32 <= num <= 126:  # 可打印ASCII范围
+                chars.append(chr(num))
+            else:
+                # 如果数字超出可打印范围，直接返回None
+                return None
 
-        return None
+        return "".join(chars)
 
     @staticmethod
     def priority() -> float:
@@ -1,12 +1,175 @@
 import re
 import time
-from typing import Dict, Optional, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 
 import logging
 from rich.logging import RichHandler
 
 from ciphey.iface import Config, Decoder, ParamSpec, T, U, WordList, registry
 
+# Brainfuck instructions compiled to integer opcodes, most frequent first
+_OPCODES = {"+": 0, "-": 1, ">": 2, "<": 3, "[": 4, "]": 5, ".": 6, ",": 7}
+# Number of memory cells available to a program
+_TAPE_SIZE = 30000
+# Programs printing more than this are stuck in a loop, not printing a plaintext
+_MAX_OUTPUT = 1 << 20
+
+# Deletes every Brainfuck instruction from a string
+_DELETE_INSTRUCTIONS = str.maketrans("", "", "+-<>[].,")
+_BRACE_RE = re.compile(r"[\[\]]")
+
+# Whitespace-delimited Ook tokens, captured by their punctuation
+_OOK_TOKEN_RE = re.compile(r"(?<!\S)ook([.!?])(?!\S)", re.IGNORECASE)
+# Splits the token punctuation into pairs; "??" is not an instruction, so only its first token is skipped
+_OOK_PAIR_RE = re.compile(r"[.!][.!?]|\?[.!]|.")
+# Ook to Brainfuck mapping based on standard Ook! specification, keyed by token punctuation
+_OOK_MAP = {
+    ".?": ">",
+    "?.": "<",
+    "..": "+",
+    "!!": "-",
+    "!.": ".",
+    ".!": ",",
+    "!?": "[",
+    "?!": "]",
+}
+
+
+def _interpret(ops: List[int], jumps: List[int], timelimit: float) -> Optional[bytearray]:
+    """
+    Runs compiled Brainfuck opcodes and returns their output,
+    or None if it took longer than `timelimit` seconds or printed more than _MAX_OUTPUT bytes
+    """
+    result = bytearray()
+    memory = bytearray(_TAPE_SIZE)
+    codeptr, memptr = 0, 0  # Instruction pointer and stack pointer
+    steps = 0
+
+    # Get start time
+    start = time.time()
+
+    while codeptr < len(ops):
+        op = ops[codeptr]
+
+        if op == 0:
+            memory[memptr] = (memory[memptr] + 1) & 0xFF
+
+        elif op == 1:
+            memory[memptr] = (memory[memptr] - 1) & 0xFF
+
+        elif op == 2:
+            memptr = (memptr + 1) % _TAPE_SIZE
+
+        elif op == 3:
+            memptr = (memptr - 1) % _TAPE_SIZE
+
+        # If we're at the beginning of the loop and the memory is 0, exit the loop
+        elif op == 4:
+            if not memory[memptr]:
+                codeptr = jumps[codeptr]
+
+        # If we're at the end of the loop and the memory is >0, jmp to the beginning of the loop
+        elif op == 5:
+            if memory[memptr]:
+                codeptr = jumps[codeptr]
+
+        # Store the output as a string instead of printing it out
+        elif op == 6:
+            result.append(memory[memptr])
+
+        # Handle input command - set memory to 0 (or some default value) to avoid hanging
+        else:
+            # For automated decryption, we assume null byte or skip input
+            memory[memptr] = 0
+
+        codeptr += 1
+
+        # Only look at the clock every 65536 instructions
+        steps += 1
+        if not steps & 0xFFFF and (
+            time.time() - start > timelimit or len(result) > _MAX_OUTPUT
+        ):
+            return None
+
+    return result
+
+
+@lru_cache()
+def _select_interpret() -> Callable[[List[int], List[int], float], Optional[bytearray]]:
+    """
+    Picks the Numba interpreter if Numba is installed and the pure Python one otherwise
+
+    Importing Numba takes a good fraction of a second, so it is left until a program actually
+    has to run rather than done whenever the module is imported
+    """
+    try:
+        import numpy as np
+        from numba import njit
+    except ImportError:
+        return _interpret
+
+    @njit(cache=True)
+    def _run_compiled(ops, jumps, memory, output, codeptr, memptr, max_steps):
+        """
+        Native version of the loop in _interpret. Runs from `codeptr` until the program ends,
+        `output` is full or `max_steps` instructions have run, so the caller can check the clock.
+        Returns the new instruction pointer, memory pointer and number of bytes written to `output`.
+        """
+        outlen = 0
+        steps = 0
+        while codeptr < ops.size and steps < max_steps:
+            op = ops[codeptr]
+            if op == 0:
+                memory[memptr] = (memory[memptr] + 1) & 0xFF
+            elif op == 1:
+                memory[memptr] = (memory[memptr] - 1) & 0xFF
+            elif op == 2:
+                memptr = (memptr + 1) % memory.size
+            elif op == 3:
+                memptr = (memptr - 1) % memory.size
+            elif op == 4:
+                if memory[memptr] == 0:
+                    codeptr = jumps[codeptr]
+            elif op == 5:
+                if memory[memptr] != 0:
+                    codeptr = jumps[codeptr]
+            elif op == 6:
+                if outlen == output.size:
+                    # Resume from this instruction once the caller has drained the output
+                    break
+                output[outlen] = memory[memptr]
+                outlen += 1
+            else:
+                memory[memptr] = 0
+            codeptr += 1
+            steps += 1
+        return codeptr, memptr, outlen
+
+    def _interpret_jit(ops: List[int], jumps: List[int], timelimit: float) -> Optional[bytearray]:
+        """
+        Same as _interpret, but runs the program in chunks of native code compiled by Numba
+        """
+        ops = np.array(ops, dtype=np.uint8)
+        jumps = np.array(jumps, dtype=np.int64)
+        memory = np.zeros(_TAPE_SIZE, dtype=np.uint8)
+        output = np.empty(1 << 16, dtype=np.uint8)
+        result = bytearray()
+        codeptr, memptr = 0, 0
+
+        start = time.time()
+        while codeptr < ops.size:
+            if time.time() - start > timelimit or len(result) > _MAX_OUTPUT:
+                return None
+            codeptr, memptr, outlen = _run_compiled(
+                ops, jumps, memory, output, codeptr, memptr, 1 << 24
+            )
+            result += output[:outlen].tobytes()
+
+        return result
+
+    return _interpret_jit
+
 
 @registry.register
 class Ook(Decoder[str]):
@@ -31,11 +194,16 @@ class Ook(Decoder[str]):
         Details:
             * This implementation wraps the memory pointer for ">" and "<"
             * It is time-limited to 60 seconds, to prevent hangups
-            * The program starts with 100 memory cells, chosen arbitrarily
+            * The tape has 30000 single-byte cells, the usual Brainfuck size
         """
 
         logging.debug("Attempting ook")
 
+        # Don't bother converting anything if there isn't a single Ook token
+        if not sum(self._count_tokens(ctext)):
+            logging.debug("Failed to find any Ook tokens")
+            return None
+
         # Convert Ook to Brainfuck
         brainfuck_code = self.ook_to_brainfuck(ctext)
         if brainfuck_code is None:
@@ -43,9 +211,6 @@ class Ook(Decoder[str]):
             return None
 
         # Now interpret the Brainfuck code
-        result = ""
-        memory = [0] * 100
-        codeptr, memptr = 0, 0  # Instruction pointer and stack pointer
         timelimit = 60  # The timeout in seconds
 
         bracemap, isbf = self.bracemap_and_check(brainfuck_code)
@@ -55,62 +220,19 @@ class Ook(Decoder[str]):
             logging.debug("Failed to interpret brainfuck due to invalid characters")
             return None
 
-        # Get start time
-        start = time.time()
-
-        while codeptr < len(brainfuck_code):
-
-            current = time.time()
+        # Compile to opcodes with a flat jump table, so the interpreter only compares ints
+        ops = [_OPCODES[cmd] for cmd in brainfuck_code]
+        jumps = [0] * len(ops)
+        for src, dest in bracemap.items():
+            jumps[src] = dest
 
+        result = _select_interpret()(ops, jumps, timelimit)
+        if result is None:
             # Return none if we've been running for over a minute
-            if current - start > timelimit:
-                logging.debug("Failed to interpret brainfuck due to timing out")
-                return None
-
-            cmd = brainfuck_code[codeptr]
-
-            if cmd == "+":
-                if memory[memptr] < 255:
-                    memory[memptr] = memory[memptr] + 1
-                else:
-                    memory[memptr] = 0
-
-            elif cmd == "-":
-                if memory[memptr] > 0:
-                    memory[memptr] = memory[memptr] - 1
-                else:
-                    memory[memptr] = 255
-
-            elif cmd == ">":
-                if memptr == len(memory) - 1:
-                    memory.append(0)
-                memptr += 1
-
-            elif cmd == "<":
-                if memptr == 0:
-                    memptr = len(memory) - 1
-                else:
-                    memptr -= 1
-
-            # If we're at the beginning of the loop and the memory is 0, exit the loop
-            elif cmd == "[" and memory[memptr] == 0:
-                codeptr = bracemap[codeptr]
-
-            # If we're at the end of the loop and the memory is >0, jmp to the beginning of the loop
-            elif cmd == "]" and memory[memptr]:
-                codeptr = bracemap[codeptr]
-
-            # Store the output as a string instead of printing it out
-            elif cmd == ".":
-                result += chr(memory[memptr])
-
-            # Handle input command - set memory to 0 (or some default value) to avoid hanging
-            elif cmd == ",":
-                # For automated decryption, we assume null byte or skip input
-                memory[memptr] = 0
-
-            codeptr += 1
+            logging.debug("Failed to interpret brainfuck due to timing out or printing too much")
+            return None
 
+        result = result.decode("latin-1")
         logging.info(f"Ook successful, returning '{result}'")
         return result
 
@@ -118,40 +240,18 @@ class Ook(Decoder[str]):
         """
         Converts an Ook! program to Brainfuck.
         """
-        # Define the Ook to Brainfuck mapping based on standard Ook! specification
-        ook_map = {
-        "ook. ook?": ">",
-        "ook? ook.": "<",
-        "ook. ook.": "+",
-        "ook! ook!": "-",
-        "ook! ook.": ".",
-        "ook. ook!": ",",
-        "ook! ook?": "[",
-        "ook? ook!": "]",
-    }
-
-        # Clean up the input - remove extra whitespace and normalize
-        cleaned = ook_program.lower().strip()
-        
-        # Split into tokens based on spaces
-        tokens = cleaned.split()
-        
-        # Group tokens into pairs
-        brainfuck_code = []
-        i = 0
-        while i < len(tokens) - 1:
-            pair = f"{tokens[i]} {tokens[i+1]}"
-            if pair in ook_map:
-                brainfuck_code.append(ook_map[pair])
-                i += 2  # Move to next pair
-            else:
-                # Skip invalid pairs - could be noise or incomplete input
-                i += 1
-        
+        # Reduce the program to the punctuation of each token, e.g. "Ook. Ook?" -> ".?"
+        tokens = "".join(_OOK_TOKEN_RE.findall(ook_program))
+
+        # Map each pair of tokens to its instruction, skipping invalid pairs
+        brainfuck_code = "".join(
+            [_OOK_MAP.get(pair, "") for pair in _OOK_PAIR_RE.findall(tokens)]
+        )
+
         if not brainfuck_code:
             return None
             
-        return "".join(brainfuck_code)
+        return brainfuck_code
 
     def bracemap_and_check(self, program: str) -> Tuple[Optional[Dict], bool]:
         """
@@ -162,43 +262,38 @@ class Ook(Decoder[str]):
         won't even try to run it.
         """
 
+        # 1. All characters are instructions or whitespace
+        # 2. There are as many open braces as closing braces
+        # 3. There is at least one character to be "printed"
+        # (result is >=1 in length)
+        # These are all checked with whole-string operations before looking at the braces
+        non_instructions = program.translate(_DELETE_INSTRUCTIONS)
+        if (
+            (non_instructions and not non_instructions.isspace())
+            or program.count("[") != program.count("]")
+            or "." not in program
+        ):
+            return (None, False)
+
         open_stack = []
         bracemap = dict()
-        legal_instructions = {"+", "-", ">", "<", "[", "]", ".", ","}
-        legal_count = 0
-
-        # If the program actually outputs anything (contains ".")
-        prints = False
-
-        for idx, instruction in enumerate(program):
-            # If instruction is brainfuck or whitespace, it counts
-            if instruction in legal_instructions or re.match(r"\s", instruction):
-                legal_count += 1
-
-            if not prints and instruction == ".":
-                # If there are no "." instructions then this program will not output anything
-                prints = True
 
-            elif instruction == "[":
+        # Only the braces themselves need to be visited to pair them up
+        for match in _BRACE_RE.finditer(program):
+            idx = match.start()
+            if match.group() == "[":
                 open_stack.append(idx)
-
-            elif instruction == "]":
+            else:
                 try:
                     opbracket = open_stack.pop()
                     bracemap[opbracket] = idx
                     bracemap[idx] = opbracket
                 except IndexError:
                     # Mismatched braces, not a valid program
-                    # Closing braces > opening braces
+                    # A closing brace comes before its opening brace
                     return (None, False)
 
-        # 1. All characters are instructions or whitespace
-        # 2. There are no extra open braces
-        # 3. There is at least one character to be "printed"
-        # (result is >=1 in length)
-        is_brainfuck = legal_count == len(program) and len(open_stack) == 0 and prints
-
-        return bracemap, is_brainfuck
+        return bracemap, True
 
     @staticmethod
     def priority() -> float:
@@ -224,9 +319,7 @@ class Ook(Decoder[str]):
         Looks for the characteristic pattern of Ook tokens.
         """
         # Count occurrences of Ook tokens
-        ook_dot_count = text.lower().count('ook.')
-        ook_exclamation_count = text.lower().count('ook!')
-        ook_question_count = text.lower().count('ook?')
+        ook_dot_count, ook_exclamation_count, ook_question_count = self._count_tokens(text)
         
         total_chars = len(text)
         
@@ -251,6 +344,16 @@ class Ook(Decoder[str]):
         
         return 0.0
 
+    def _count_tokens(self, text: str) -> Tuple[int, int, int]:
+        """
+        Returns the number of "ook.", "ook!" and "ook?" tokens in the text, ignoring case.
+        """
+        lower = text.lower()
+        if "ook" not in lower:
+            # One search settles it for most text, instead of three counts
+            return 0, 0, 0
+        return lower.count("ook."), lower.count("ook!"), lower.count("ook?")
+
     def __init__(self, config: Config):
         super().__init__(config)
         self.ALPHABET = config.get_resource(self._params()["dict"], WordList)
@@ -7,6 +7,10 @@ from typing import Optional, Dict
 import re
 from ciphey.iface import Config, Decoder, ParamSpec, T, U, registry
 
+# 匹配原子序数
+_NUMBER_RE = re.compile(r'\d+')
+
+
 @registry.register
 class PeriodicTable(Decoder[str]):
     """
@@ -16,46 +20,42 @@ class PeriodicTable(Decoder[str]):
 
     def __init__(self, config: Config):
         super().__init__(config)
-        # 原子序数到元素符号的映射（扩展版）
-        self.atomic_numbers = {
-            1: 'H', 2: 'He', 3: 'Li', 4: 'Be', 5: 'B', 6: 'C', 7: 'N', 8: 'O', 9: 'F', 10: 'Ne',
-            11: 'Na', 12: 'Mg', 13: 'Al', 14: 'Si', 15: 'P', 16: 'S', 17: 'Cl', 18: 'Ar', 19: 'K', 20: 'Ca',
-            21: 'Sc', 22: 'Ti', 23: 'V', 24: 'Cr', 25: 'Mn', 26: 'Fe', 27: 'Co', 28: 'Ni', 29: 'Cu', 30: 'Zn',
-            31: 'Ga', 32: 'Ge', 33: 'As', 34: 'Se', 35: 'Br', 36: 'Kr', 37: 'Rb', 38: 'Sr', 39: 'Y', 40: 'Zr',
-            41: 'Nb', 42: 'Mo', 43: 'Tc', 44: 'Ru', 45: 'Rh', 46: 'Pd', 47: 'Ag', 48: 'Cd', 49: 'In', 50: 'Sn',
-            51: 'Sb', 52: 'Te', 53: 'I', 54: 'Xe', 55: 'Cs', 56: 'Ba', 57: 'La', 58: 'Ce', 59: 'Pr', 60: 'Nd',
-            61: 'Pm', 62: 'Sm', 63: 'Eu', 64: 'Gd', 65: 'Tb', 66: 'Dy', 67: 'Ho', 68: 'Er', 69: 'Tm', 70: 'Yb',
-            71: 'Lu', 72: 'Hf', 73: 'Ta', 74: 'W', 75: 'Re', 76: 'Os', 77: 'Ir', 78: 'Pt', 79: 'Au', 80: 'Hg',
-            81: 'Tl', 82: 'Pb', 83: 'Bi', 84: 'Po', 85: 'At', 86: 'Rn', 87: 'Fr', 88: 'Ra', 89: 'Ac', 90: 'Th',
-            91: 'Pa', 92: 'U', 93: 'Np', 94: 'Pu', 95: 'Am', 96: 'Cm', 97: 'Bk', 98: 'Cf', 99: 'Es', 100: 'Fm',
-            101: 'Md', 102: 'No', 103: 'Lr', 104: 'Rf', 105: 'Db', 106: 'Sg', 107: 'Bh', 108: 'Hs', 109: 'Mt',
-            110: 'Ds', 111: 'Rg', 112: 'Cn', 113: 'Nh', 114: 'Fl', 115: 'Mc', 116: 'Lv', 117: 'Ts', 118: 'Og'
-        }
+        # 原子序数到元素符号的映射（扩展版），按原子序数直接索引，下标0不对应任何元素
+        self.atomic_numbers = (
+            None,
+            'H', 'He', 'Li', 'Be', 'B', 'C', 'N', 'O', 'F', 'Ne',  # 1-10
+            'Na', 'Mg', 'Al', 'Si', 'P', 'S', 'Cl', 'Ar', 'K', 'Ca',  # 11-20
+            'Sc', 'Ti', 'V', 'Cr', 'Mn', 'Fe', 'Co', 'Ni', 'Cu', 'Zn',  # 21-30
+            'Ga', 'Ge', 'As', 'Se', 'Br', 'Kr', 'Rb', 'Sr', 'Y', 'Zr',  # 31-40
+            'Nb', 'Mo', 'Tc', 'Ru', 'Rh', 'Pd', 'Ag', 'Cd', 'In', 'Sn',  # 41-50
+            'Sb', 'Te', 'I', 'Xe', 'Cs', 'Ba', 'La', 'Ce', 'Pr', 'Nd',  # 51-60
+            'Pm', 'Sm', 'Eu', 'Gd', 'Tb', 'Dy', 'Ho', 'Er', 'Tm', 'Yb',  # 61-70
+            'Lu', 'Hf', 'Ta', 'W', 'Re', 'Os', 'Ir', 'Pt', 'Au', 'Hg',  # 71-80
+            'Tl', 'Pb', 'Bi', 'Po', 'At', 'Rn', 'Fr', 'Ra', 'Ac', 'Th',  # 81-90
+            'Pa', 'U', 'Np', 'Pu', 'Am', 'Cm', 'Bk', 'Cf', 'Es', 'Fm',  # 91-100
+            'Md', 'No', 'Lr', 'Rf', 'Db', 'Sg', 'Bh', 'Hs', 'Mt', 'Ds',  # 101-110
+            'Rg', 'Cn', 'Nh', 'Fl', 'Mc', 'Lv', 'Ts', 'Og',  # 111-118
+        )
 
     def decode(self, ctext: T) -> Optional[U]:
         """
         解码元素周期表编码
         """
         # 提取所有的数字（可能是空格分隔或逗号分隔）
-        numbers = re.findall(r'\d+', ctext)
+        numbers = _NUMBER_RE.findall(ctext)
         
         if not numbers:
             return None
 
-        # 将数字转换为元素符号
-        element_symbols = []
-        for num_str in numbers:
-            try:
-                num = int(num_str)
-                if num in self.atomic_numbers:
-                    element_symbols.append(self.atomic_numbers[num])
-                else:
-                    # 如果原子序数不在范围内，则返回None
-                    return None
-            except ValueError:
-                return None
-
-        if not element_symbols:
+        # 将数字转换为元素符号，直接按原子序数索引
+        symbols = self.atomic_numbers
+        try:
+            element_symbols = [symbols[num] for num in map(int, numbers) if 1 <= num <= 118]
+        except ValueError:
+            # 数字过长（超过int的位数限制）时无法转换
+            return None
+        if len(element_symbols) != len(numbers):
+            # 如果有原子序数不在范围内，则返回None
             return None
 
         # 将元素符号连接起来
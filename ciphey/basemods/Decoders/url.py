@@ -15,6 +15,10 @@ class Url(Decoder[str]):
         Handles both standard %XX format and alternative =XX format
         """
         logging.debug("Attempting URL")
+        # Without any of these there is nothing to decode
+        if "%" not in ctext and "+" not in ctext and "=" not in ctext:
+            return None
+
         result = ""
         try:
             # First try standard URL decoding
@@ -1,17 +1,163 @@
-from typing import Dict, Optional
+import ctypes
+import ctypes.util
+import struct
+from functools import lru_cache
+from typing import Callable, Dict, Optional
 
 import logging
-from rich.logging import RichHandler
-
-try:
-    from zmq.utils import z85
-    Z85_AVAILABLE = True
-except ImportError:
-    z85 = None
-    Z85_AVAILABLE = False
 
 from ciphey.iface import Config, Decoder, ParamSpec, T, U, registry
 
+# Every byte that may appear in Z85 text
+_Z85_ALPHABET = (
+    b"0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ.-:+=^!/*?&<>()[]{}@%$#"
+)
+_Z85_CHARS = frozenset(_Z85_ALPHABET.decode("ascii"))
+# Maps each alphabet byte to its base 85 digit and every other byte to 0xFF, so that one
+# translate both validates the text and yields the digits
+_Z85_DIGITS = bytes.maketrans(
+    _Z85_ALPHABET + bytes(sorted(set(range(256)) - set(_Z85_ALPHABET))),
+    bytes(range(85)) + b"\xff" * (256 - 85),
+)
+
+
+@lru_cache()
+def _load_native_decode():
+    """
+    Binds libzmq's zmq_z85_decode, which runs the base 85 arithmetic in C
+
+    Functions loaded through CDLL (unlike PyDLL) release the GIL while they run, so
+    decodes on other threads are not serialised behind it
+    """
+    # find_library needs ldconfig or a compiler on Linux, so also try the runtime sonames
+    names = [ctypes.util.find_library("zmq"), "libzmq.so.5", "libzmq.5.dylib"]
+    for name in filter(None, names):
+        try:
+            func = ctypes.CDLL(name).zmq_z85_decode
+            break
+        except (OSError, AttributeError):
+            continue
+    else:
+        return None
+    func.restype = ctypes.c_void_p
+    func.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
+    return func
+
+
+def _z85_decode_native(ctext: bytes) -> Optional[bytes]:
+    """
+    Decodes Z85 with libzmq, returning None if the text is not valid Z85
+
+    libzmq reads a C string and rejects empty input, so ctext must be non-empty
+    """
+    # Checking the alphabet also rules out embedded NULs, which would truncate the input
+    if ctext.translate(None, _Z85_ALPHABET):
+        return None
+    dest = ctypes.create_string_buffer(len(ctext) * 4 // 5)
+    if _load_native_decode()(dest, ctext) is None:
+        return None
+    return dest.raw
+
+
+# Five base 85 digits can exceed 32 bits, which makes the text invalid
+_MAX_GROUP = 0xFFFFFFFF
+# Groups leading with one of these digits can never exceed _MAX_GROUP
+_SAFE_LEADING_DIGITS = bytes(range(_MAX_GROUP // 85 ** 4))
+
+
+def _decode_groups(digits: bytes) -> Optional[bytes]:
+    """Decodes any number of groups of base 85 digits"""
+    # Striding picks out the n-th digit of every group, so the arithmetic runs once per group
+    leading = digits[0::5]
+    values = [
+        (((a * 85 + b) * 85 + c) * 85 + d) * 85 + e
+        for a, b, c, d, e in zip(
+            leading, digits[1::5], digits[2::5], digits[3::5], digits[4::5]
+        )
+    ]
+    # Only look for overflowing groups if a leading digit is high enough to allow one
+    if leading.translate(None, _SAFE_LEADING_DIGITS) and max(values) > _MAX_GROUP:
+        return None
+    return struct.pack(f">{len(values)}I", *values)
+
+
+def _decode_groups_swar(digits: bytes) -> Optional[bytes]:
+    """
+    Decodes groups of base 85 digits with arithmetic on one big integer holding every group
+
+    Each group gets its own 5 byte lane. A group is below 85 ** 5 < 2 ** 40, so lanes never
+    carry into each other, and the lane's top byte is non-zero exactly when it overflows
+    """
+    lanes = bytearray(len(digits))
+    acc = 0
+    for place in range(5):
+        lanes[4::5] = digits[place::5]
+        acc = acc * 85 + int.from_bytes(lanes, "big")
+    decoded = acc.to_bytes(len(digits), "big")
+    if decoded[0::5].strip(b"\0"):
+        return None
+    out = bytearray(len(digits) // 5 * 4)
+    out[0::4] = decoded[1::5]
+    out[1::4] = decoded[2::5]
+    out[2::4] = decoded[3::5]
+    out[3::4] = decoded[4::5]
+    return bytes(out)
+
+
+# Below this many digits, setting up the lanes costs more than decoding group by group
+_SWAR_MIN_LENGTH = 100
+
+
+_pack_one = struct.Struct(">I").pack
+_pack_two = struct.Struct(">II").pack
+
+
+def _decode_one_group(digits: bytes) -> Optional[bytes]:
+    a, b, c, d, e = digits
+    first = (((a * 85 + b) * 85 + c) * 85 + d) * 85 + e
+    if first > _MAX_GROUP:
+        return None
+    return _pack_one(first)
+
+
+def _decode_two_groups(digits: bytes) -> Optional[bytes]:
+    a, b, c, d, e, f, g, h, i, j = digits
+    first = (((a * 85 + b) * 85 + c) * 85 + d) * 85 + e
+    second = (((f * 85 + g) * 85 + h) * 85 + i) * 85 + j
+    if first > _MAX_GROUP or second > _MAX_GROUP:
+        return None
+    return _pack_two(first, second)
+
+
+# Short candidates are common, and for them slicing and building lists costs more than
+# the arithmetic, so they get unrolled kernels
+_SMALL_KERNELS = {5: _decode_one_group, 10: _decode_two_groups}
+
+
+def _z85_decode_python(ctext: bytes) -> Optional[bytes]:
+    """
+    Decodes Z85 without libzmq, returning None if the text is not valid Z85
+    """
+    digits = ctext.translate(_Z85_DIGITS)
+    if b"\xff" in digits:
+        return None
+    if len(digits) >= _SWAR_MIN_LENGTH:
+        return _decode_groups_swar(digits)
+    return _SMALL_KERNELS.get(len(digits), _decode_groups)(digits)
+
+
+@lru_cache()
+def _select_decode() -> Callable[[bytes], Optional[bytes]]:
+    """
+    Picks libzmq if it can be loaded and the built-in decoder otherwise
+
+    Looking for libzmq runs ldconfig and loads a large library, so it is left until a Z85
+    decoder is actually constructed rather than done whenever the module is imported
+    """
+    if _load_native_decode() is not None:
+        return _z85_decode_native
+    return _z85_decode_python
+
 
 @registry.register
 class Z85(Decoder[str]):
@@ -19,19 +165,27 @@ class Z85(Decoder[str]):
         """
         Performs Z85 decoding
         """
-        if not Z85_AVAILABLE:
-            logging.debug("Z85 not available (zmq not installed)")
-            return None
         ctext_len = len(ctext)
-        if ctext_len % 5:
+        if not ctext_len or ctext_len % 5:
+            # Most candidates end up here, so leave the formatting to logging
             logging.debug(
-                f"Failed to decode Z85 because length must be a multiple of 5, not '{ctext_len}'"
+                "Failed to decode Z85 because length must be a positive multiple of 5, not '%d'",
+                ctext_len,
             )
             return None
-        try:
-            return z85.decode(ctext).decode("utf-8")
-        except Exception:
+        # Most candidates give themselves away within the first few characters
+        if not _Z85_CHARS.issuperset(ctext[:32]):
+            return None
+        if not ctext.isascii():
+            return None
+        # Both decoders check the whole alphabet before doing any arithmetic
+        plaintext = self._decode_z85(ctext.encode("ascii"))
+        if plaintext is None:
+            logging.debug("Failed to decode Z85 because the text is not valid Z85")
             return None
+        # Z85 usually carries binary (such as CURVE keys), so return the bytes as they are
+        # and leave it to the utf8 decoder to turn text into a string
+        return plaintext
 
     @staticmethod
     def priority() -> float:
@@ -40,6 +194,7 @@ class Z85(Decoder[str]):
 
     def __init__(self, config: Config):
         super().__init__(config)
+        self._decode_z85 = _select_decode()
 
     @staticmethod
     def getParams() -> Optional[Dict[str, ParamSpec]]: